@@ -14,11 +14,6 @@ if ! command -v python3 &> /dev/null; then
     exit 1
 fi
 
-# Ensure notify-send is available (for notifications)
-if ! command -v notify-send &> /dev/null; then
-    echo "Warning: 'notify-send' not found. Please install libnotify (e.g., 'sudo apt install libnotify-bin' or 'sudo dnf install libnotify')."
-fi
-
 # Create app directory
 mkdir -p "$APP_DIR"
 mkdir -p "$BIN_DIR"
@@ -3,7 +3,8 @@
 OMEN Battery  ─  A beautiful charge-limit monitor for HP OMEN on Linux
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 Since HP OMEN 16-xd0 has no kernel threshold API, this tool:
-  • Watches capacity every 30s via /sys/class/power_supply/BAT1/
+  • Watches /sys/class/power_supply/BAT1/, woken by kernel uevents
+    (polling every 30s while the panel is open or uevents are unavailable)
   • Sends a KDE notification (with sound) when you should unplug
   • Tracks "Top Up" mode: suppress the 80% alert for one full cycle
   • Shows a beautiful translucent panel widget when you click the tray icon
@@ -14,19 +15,23 @@ Run:      python3 -m src.omen_battery.main
 
 import sys
 import os
+import errno
 import math
+import functools
 import json
-import subprocess
+import time
+import socket
+from dataclasses import dataclass
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QSystemTrayIcon, QMenu, QWidget,
-    QPushButton, QLabel, QFrame, QGraphicsBlurEffect
+    QPushButton, QLabel, QGraphicsBlurEffect
 )
 from PyQt6.QtCore import (
     Qt, QTimer, QPoint, QRect, QSize, QPropertyAnimation,
     QEasingCurve, QThread, pyqtSignal, QObject, pyqtProperty,
-    QPointF
+    QPointF, QMetaType, QSocketNotifier, QVariant
 )
 from PyQt6.QtGui import (
     QPainter, QPen, QColor, QBrush, QFont, QFontDatabase,
@@ -34,46 +39,162 @@ from PyQt6.QtGui import (
     QIcon, QPixmap, QPainterPath, QRegion, QCursor,
     QFontMetrics
 )
+from PyQt6 import sip
+from PyQt6.QtDBus import QDBusConnection, QDBusMessage
 
 # ── sysfs paths ───────────────────────────────────────────────────────────────
 BAT = Path("/sys/class/power_supply/BAT1")
 AC  = Path("/sys/class/power_supply/ACAD")
 STATE_FILE = Path.home() / ".local/share/omen-battery/state.json"
 
-def sysread(p):
-    try: return Path(p).read_text().strip()
-    except: return None
+# sysfs attributes are re-read in place, so each file is opened only once
+_fd_cache = {}
 
-def sysint(p):
-    v = sysread(p)
-    return int(v) if v and v.lstrip('-').isdigit() else 0
+def _pread(p, retry=True):
+    fd = _fd_cache.get(p)
+    try:
+        if fd is None:
+            fd = _fd_cache[p] = os.open(p, os.O_RDONLY)
+        return os.pread(fd, 32, 0)
+    except OSError as e:
+        if fd is not None:
+            del _fd_cache[p]
+            try: os.close(fd)
+            except OSError: pass
+            # The battery node can go away and come back across hibernate
+            if e.errno == errno.ENODEV and retry:
+                return _pread(p, retry=False)
+        return None
+
+def _str(buf):
+    return buf.rstrip().decode("ascii", "replace") if buf else None
+
+def _int(buf):
+    try: return int(buf)
+    except (TypeError, ValueError): return 0
+
+def sysread_many(paths):
+    """Raw bytes of each sysfs file, one pread() apiece (None where unreadable)"""
+    return [_pread(p) for p in paths]
 
 # ── Battery data snapshot ─────────────────────────────────────────────────────
+@dataclass(frozen=True)
 class BattData:
+    capacity:      int   = 0
+    status:        str   = "Unknown"
+    energy_now:    float = 0.0
+    energy_full:   float = 0.0
+    energy_design: float = 0.0
+    power_avg_w:   float = 0.0     # smoothed power_now, see BatterySampler
+    voltage_v:     float = 0.0
+    cycle_count:   int   = 0
+    ac_online:     int   = 0
+
+    @property
+    def bios_cap_pct(self):
+        return round(self.energy_full / self.energy_design * 100, 1) if self.energy_design else 0
+
+    @property
+    def time_str(self):
+        # Uses the smoothed power and 5-minute steps so the estimate doesn't jitter
+        power = self.power_avg_w
+        if power <= 0.1:
+            return "—"
+        if self.status == "Discharging":
+            h = self.energy_now / power
+        elif self.status in ("Charging", "Not charging"):
+            h = max(0, (self.energy_full - self.energy_now) / power)
+        else:
+            h = 0
+        minutes = round(h * 12) * 5
+        if minutes <= 0:
+            return "—"
+        hi, m = divmod(minutes, 60)
+        return f"{hi}h {m:02d}m"
+
+# ── sysfs sampler ─────────────────────────────────────────────────────────────
+class BatterySampler:
+    """
+    Single source of BattData for both the panel and the tray.
+    Only refreshes the slow-changing capacity fields once an hour.
+    """
+    fast_paths = ["capacity", "status", "energy_now", "power_now", "voltage_now", "online"]
+    slow_paths = ["energy_full", "energy_full_design", "cycle_count"]
+    SLOW_INTERVAL = 3600
+    POWER_ALPHA   = 0.2    # EWMA weight of a power_now reading after POWER_STEP seconds
+    POWER_STEP    = 30
+
     def __init__(self):
-        self.capacity     = sysint(BAT / "capacity")
-        self.status       = sysread(BAT / "status") or "Unknown"
-        self.energy_now   = sysint(BAT / "energy_now")   / 1_000_000
-        self.energy_full  = sysint(BAT / "energy_full")  / 1_000_000
-        self.energy_design= sysint(BAT / "energy_full_design") / 1_000_000
-        self.power_w      = sysint(BAT / "power_now")    / 1_000_000
-        self.voltage_v    = sysint(BAT / "voltage_now")  / 1_000_000
-        self.cycle_count  = sysint(BAT / "cycle_count")
-        self.ac_online    = sysint(AC  / "online")
-        # derived
-        self.bios_cap_pct = round(self.energy_full / self.energy_design * 100, 1) if self.energy_design else 0
-        # time estimate
-        self.time_str = "—"
-        if self.power_w > 0.1:
-            if self.status == "Discharging":
-                h = self.energy_now / self.power_w
-            elif self.status in ("Charging", "Not charging"):
-                h = max(0, (self.energy_full - self.energy_now) / self.power_w)
-            else:
-                h = 0
-            if h > 0:
-                hi, m = int(h), int((h % 1) * 60)
-                self.time_str = f"{hi}h {m:02d}m"
+        self._slow = {}
+        self._last_slow = None
+        self.power_ewma = None
+        self._ewma_ac = None
+        self._ewma_at = None
+        # Resolved once, so a tick is just one pread() per already-open fd
+        self._fast_files = [str(self._path(name)) for name in self.fast_paths]
+        self._slow_files = [str(self._path(name)) for name in self.slow_paths]
+
+    @staticmethod
+    def _path(name):
+        return AC / name if name == "online" else BAT / name
+
+    def snapshot(self, force=False):
+        now = time.monotonic()
+        if force or self._last_slow is None or now - self._last_slow > self.SLOW_INTERVAL:
+            raw = sysread_many(self._slow_files)
+            self._slow = {name: _int(buf) for name, buf in zip(self.slow_paths, raw)}
+            self._last_slow = now
+        raw = dict(zip(self.fast_paths, sysread_many(self._fast_files)))
+        power_w = _int(raw["power_now"]) / 1_000_000
+        ac_online = _int(raw["online"])
+        # Restart the average on plug/unplug: the old draw no longer applies
+        if self.power_ewma is None or ac_online != self._ewma_ac:
+            self.power_ewma = power_w
+            self._ewma_ac = ac_online
+        else:
+            # Weight by elapsed time, so extra samples (panel opens, uevents)
+            # don't make the average move faster than the 30s poll would
+            steps = (now - self._ewma_at) / self.POWER_STEP
+            a = 1 - (1 - self.POWER_ALPHA) ** steps
+            self.power_ewma = a * power_w + (1 - a) * self.power_ewma
+        self._ewma_at = now
+        return BattData(
+            capacity      = _int(raw["capacity"]),
+            status        = _str(raw["status"]) or "Unknown",
+            energy_now    = _int(raw["energy_now"]) / 1_000_000,
+            energy_full   = self._slow["energy_full"] / 1_000_000,
+            energy_design = self._slow["energy_full_design"] / 1_000_000,
+            power_avg_w   = self.power_ewma,
+            voltage_v     = _int(raw["voltage_now"]) / 1_000_000,
+            cycle_count   = self._slow["cycle_count"],
+            ac_online     = ac_online,
+        )
+
+sampler = BatterySampler()
+
+# ── Kernel uevents ────────────────────────────────────────────────────────────
+NETLINK_KOBJECT_UEVENT = 15
+
+def open_uevent_socket():
+    """Non-blocking socket receiving kernel uevents, or None if unavailable"""
+    try:
+        s = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        s.bind((0, 1))   # multicast group 1: kernel events
+        s.setblocking(False)
+        return s
+    except (OSError, AttributeError):
+        return None
+
+def drain_power_supply_uevents(s):
+    """Read every queued uevent; True if any came from a power_supply device"""
+    hit = False
+    while True:
+        try:
+            msg = s.recv(8192)
+        except OSError:
+            return hit
+        if b"SUBSYSTEM=power_supply" in msg.split(b"\0"):
+            hit = True
 
 # ── State persistence ─────────────────────────────────────────────────────────
 def load_state():
@@ -83,18 +204,51 @@ def load_state():
         return {"limit": 80, "top_up_active": False, "notified_at": -1}
 
 def save_state(s):
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(s))
+    # Write-then-rename so a crash mid-write never leaves a truncated file
+    tmp = STATE_FILE.with_name(STATE_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(s))
+    os.replace(tmp, STATE_FILE)
 
 # ── KDE notification ──────────────────────────────────────────────────────────
+URGENCY = {"low": 0, "normal": 1, "critical": 2}
+
+def _typed(value, type_):
+    # D-Bus needs exact wire types (u, y, as) that plain Python values don't carry
+    v = QVariant(value)
+    v.convert(QMetaType(type_.value))
+    return v
+
 def notify(title, body, urgency="normal", icon="battery-caution"):
-    subprocess.Popen([
-        "notify-send",
-        f"--urgency={urgency}",
-        f"--icon={icon}",
-        "--app-name=OMEN Battery",
-        title, body
-    ])
+    """
+    Talk to org.freedesktop.Notifications directly instead of forking notify-send.
+    A plain method call lets the bus activate the daemon if it isn't running
+    yet, and send() queues the message without waiting for a reply.
+    Returns False if the message could not be sent.
+    """
+    msg = QDBusMessage.createMethodCall(
+        "org.freedesktop.Notifications",
+        "/org/freedesktop/Notifications",
+        "org.freedesktop.Notifications",
+        "Notify"
+    )
+    # Keep PyQt from unwrapping the typed QVariants back into Python objects,
+    # which Qt would then fail to marshal as PyQt_PyObject
+    autoconv = sip.enableautoconversion(QVariant, False)
+    try:
+        msg.setArguments([
+            QVariant("OMEN Battery"),
+            _typed(0, QMetaType.Type.UInt),                       # replaces_id
+            QVariant(icon), QVariant(title), QVariant(body),
+            _typed([], QMetaType.Type.QStringList),               # actions
+            QVariant({"urgency": _typed(URGENCY.get(urgency, 1), QMetaType.Type.UChar)}),
+            QVariant(-1),                                         # expire_timeout
+        ])
+        sent = QDBusConnection.sessionBus().send(msg)
+    finally:
+        sip.enableautoconversion(QVariant, autoconv)
+    if not sent:
+        print(f"Notification failed: {title}", file=sys.stderr)
+    return sent
 
 # ── Colour palette ────────────────────────────────────────────────────────────
 C = {
@@ -119,36 +273,121 @@ C = {
 }
 
 # ── Arc gauge widget ──────────────────────────────────────────────────────────
+# Arc angles: start at 225° (bottom-left), sweep 270° clockwise
+ARC_START    = 225
+ARC_SPAN     = 270
+ARC_START_16 = ARC_START * 16          # QPainter arc angles are in 1/16°
+ARC_SPAN_16  = -ARC_SPAN * 16
+ARC_PCT_16   = ARC_SPAN_16 / 100       # sweep per percent
+
+# cos/sin of the limit-marker angle for every integer limit 0..100
+_COS = [math.cos(math.radians(ARC_START - i * ARC_SPAN / 100)) for i in range(101)]
+_SIN = [math.sin(math.radians(ARC_START - i * ARC_SPAN / 100)) for i in range(101)]
+
+@functools.lru_cache(maxsize=256)
+def _limit_xy(r_outer: int, limit: int) -> tuple[float, float, float, float]:
+    """Limit-marker endpoints (x1, y1, x2, y2) relative to the gauge centre"""
+    c, s = _COS[limit], _SIN[limit]
+    return ((r_outer - 18) * c, -(r_outer - 18) * s,
+            (r_outer + 2) * c,  -(r_outer + 2) * s)
+
 class ArcGauge(QWidget):
+    _TRACK_PEN       = QPen(C["arc_track"], 13, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
+    _LIMIT_PEN       = QPen(C["arc_limit"], 2.5, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
+    _TOPUP_LIMIT_PEN = QPen(C["arc_topup"], 2.5, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
+    _MAIN_PEN        = QPen(C["text_main"])
+    _DIM_PEN         = QPen(C["text_dim"])
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(160, 160)  # matches GAUGE_SIZE=160 defined at module level
+        # Fonts need a QApplication, so they are built per widget rather than at import
+        self._pct_font    = QFont("Helvetica Neue", 32, QFont.Weight.Light)
+        self._pct_fm      = QFontMetrics(self._pct_font)
+        self._sym_font    = QFont("Helvetica Neue", 13, QFont.Weight.Light)
+        self._status_font = QFont("Helvetica Neue", 9)
+        self._status_fm   = QFontMetrics(self._status_font)
+        self._arc_rect    = self._arc_bounds()
+        self._arc_brush_cache: dict[int, QBrush] = {}
+        self._arc_pen_key = None
+        self._arc_pen     = None
         self._pct   = 0.0
         self._limit = 80
         self._topup = False
         self._status = "Unknown"
         self._animated_pct = 0.0
-        self._anim_timer = QTimer(self)
-        self._anim_timer.timeout.connect(self._step_anim)
-        self._anim_timer.start(16)
-
-    def _step_anim(self):
-        target = float(self._pct)
-        diff = target - self._animated_pct
-        if abs(diff) > 0.2:
-            self._animated_pct += diff * 0.08
-            self.update()
-        elif abs(diff) > 0.01:
-            self._animated_pct = target
-            self.update()
+        # Driven by Qt's shared animation timer, only for ~350ms after a change
+        self._anim = QPropertyAnimation(self, b"animated_pct", self)
+        self._anim.setDuration(350)
+        self._anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+
+    def _get_animated_pct(self):
+        return self._animated_pct
+
+    def _set_animated_pct(self, value):
+        self._animated_pct = value
+        self.update(self._arc_rect)   # only the sweep moves; the text is unchanged
+
+    def _arc_bounds(self):
+        # The ring plus half the pen width. Only the strip below the arc's ends
+        # is left out; the centre text is still inside, so this trims roughly a
+        # fifth of the widget rather than isolating the sweep
+        w, h = self.width(), self.height()
+        cx, cy = w / 2, h / 2
+        r = min(w, h) / 2 - 10
+        top = cy - r - 7
+        bottom = cy - r * _SIN[0] + 7     # the arc's ends are its lowest points
+        return QRect(int(cx - r - 7), int(top), int(2 * r + 14) + 1, int(bottom - top) + 1)
+
+    animated_pct = pyqtProperty(float, fget=_get_animated_pct, fset=_set_animated_pct)
+
+    def _settled(self):
+        return abs(float(self._pct) - self._animated_pct) <= 0.01
+
+    def _start_anim(self):
+        # No start value: the animation picks up from the current animated_pct
+        self._anim.stop()
+        self._anim.setEndValue(float(self._pct))
+        self._anim.start()
 
     def set_data(self, pct, limit, topup, status):
+        if (pct, limit, topup, status) == (self._pct, self._limit, self._topup, self._status):
+            return
         self._pct = pct
         self._limit = limit
         self._topup = topup
         self._status = status
+        if not self._settled() and self.isVisible():
+            self._start_anim()
         self.update()
 
+    def showEvent(self, e):
+        if not self._settled():
+            self._start_anim()
+        super().showEvent(e)
+
+    def hideEvent(self, e):
+        self._anim.stop()
+        super().hideEvent(e)
+
+    def _value_pen(self, color):
+        # Gradient and pen only depend on the arc colour, never on the sweep
+        key = color.rgba()
+        if key != self._arc_pen_key:
+            brush = self._arc_brush_cache.get(key)
+            if brush is None:
+                grad = QConicalGradient(self.width() / 2, self.height() / 2, ARC_START)
+                c1 = QColor(color)
+                c2 = QColor(color)
+                c1.setAlpha(255)
+                c2.setAlpha(160)
+                grad.setColorAt(0.0, c1)
+                grad.setColorAt(1.0, c2)
+                brush = self._arc_brush_cache[key] = QBrush(grad)
+            self._arc_pen = QPen(brush, 13, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
+            self._arc_pen_key = key
+        return self._arc_pen
+
     def paintEvent(self, event):
         p = QPainter(self)
         p.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -157,28 +396,17 @@ class ArcGauge(QWidget):
         r_outer = min(w, h) / 2 - 10
         r_inner = r_outer - 14
 
-        # Arc angles: start at 225° (bottom-left), sweep 270°
-        START = 225
-        SPAN  = 270
-
         # Track arc
-        pen = QPen(C["arc_track"], 13, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
-        p.setPen(pen)
+        p.setPen(self._TRACK_PEN)
         rect = QRect(int(cx - r_outer), int(cy - r_outer),
                      int(r_outer * 2), int(r_outer * 2))
-        p.drawArc(rect, int(START * 16), int(-SPAN * 16))
+        p.drawArc(rect, ARC_START_16, ARC_SPAN_16)
 
         # Limit marker line
-        limit_angle = START - (self._limit / 100.0) * SPAN
-        lrad = math.radians(limit_angle)
-        lx1 = cx + (r_outer - 18) * math.cos(lrad)
-        ly1 = cy - (r_outer - 18) * math.sin(lrad)
-        lx2 = cx + (r_outer + 2) * math.cos(lrad)
-        ly2 = cy - (r_outer + 2) * math.sin(lrad)
-        lpen = QPen(C["arc_limit"] if not self._topup else C["arc_topup"], 2.5,
-                    Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
-        p.setPen(lpen)
-        p.drawLine(QPointF(lx1, ly1), QPointF(lx2, ly2))
+        limit = max(0, min(100, int(self._limit)))
+        dx1, dy1, dx2, dy2 = _limit_xy(int(r_outer), limit)
+        p.setPen(self._TOPUP_LIMIT_PEN if self._topup else self._LIMIT_PEN)
+        p.drawLine(QPointF(cx + dx1, cy + dy1), QPointF(cx + dx2, cy + dy2))
 
         # Value arc (animated)
         pct = max(0, min(100, self._animated_pct))
@@ -188,81 +416,85 @@ class ArcGauge(QWidget):
         elif self._topup:
             arc_color = C["arc_topup"]
 
-        sweep = (pct / 100.0) * SPAN
-        grad = QConicalGradient(cx, cy, START)
-        c1 = QColor(arc_color)
-        c2 = QColor(arc_color)
-        c1.setAlpha(255)
-        c2.setAlpha(160)
-        grad.setColorAt(0.0, c1)
-        grad.setColorAt(1.0, c2)
-        pen2 = QPen(QBrush(grad), 13, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
-        p.setPen(pen2)
-        p.drawArc(rect, int(START * 16), int(-sweep * 16))
+        p.setPen(self._value_pen(arc_color))
+        p.drawArc(rect, ARC_START_16, int(pct * ARC_PCT_16))
 
         # Percentage text
-        pct_font = QFont("Helvetica Neue", 32, QFont.Weight.Light)
-        p.setFont(pct_font)
-        p.setPen(C["text_main"])
+        p.setFont(self._pct_font)
+        p.setPen(self._MAIN_PEN)
         pct_str = f"{int(self._pct)}"
-        fm = QFontMetrics(pct_font)
-        tw = fm.horizontalAdvance(pct_str)
-        th = fm.height()
+        tw = self._pct_fm.horizontalAdvance(pct_str)
+        th = self._pct_fm.height()
         p.drawText(int(cx - tw / 2), int(cy + th / 4), pct_str)
 
         # % symbol
-        sym_font = QFont("Helvetica Neue", 13, QFont.Weight.Light)
-        p.setFont(sym_font)
-        p.setPen(C["text_dim"])
-        sfm = QFontMetrics(sym_font)
-        sw = sfm.horizontalAdvance("%")
+        p.setFont(self._sym_font)
+        p.setPen(self._DIM_PEN)
         p.drawText(int(cx + tw / 2 + 2), int(cy + th / 4), "%")
 
         # Status text below
-        status_font = QFont("Helvetica Neue", 9)
-        p.setFont(status_font)
-        p.setPen(C["text_dim"])
+        p.setFont(self._status_font)
         st = self._status.upper()
-        sfm2 = QFontMetrics(status_font)
-        stw = sfm2.horizontalAdvance(st)
+        stw = self._status_fm.horizontalAdvance(st)
         p.drawText(int(cx - stw / 2), int(cy + th / 4 + 22), st)
 
         p.end()
 
-# ── Stat row widget ───────────────────────────────────────────────────────────
-class StatRow(QWidget):
-    def __init__(self, label, value="—", color=None, parent=None):
+# ── Stats grid widget ─────────────────────────────────────────────────────────
+class StatsGrid(QWidget):
+    """All stat rows in one widget: dim label on the left, value right-aligned"""
+    def __init__(self, labels, parent=None):
         super().__init__(parent)
-        self.setFixedHeight(22)
-        self._label = label
-        self._value = value
-        self._color = color or C["text_main"]
-
-    def set_value(self, v, color=None):
-        self._value = v
-        if color:
-            self._color = color
-        self.update()
+        self._rows: list[tuple[str, str, QColor]] = [(l, "—", C["text_main"]) for l in labels]
+        if sys.platform == "darwin":
+            self._label_font = QFont("SF Pro Text", 10)
+            self._value_font = QFont("SF Pro Text", 10, QFont.Weight.Medium)
+        else:
+            self._label_font = QFont("Noto Sans", 9)
+            self._value_font = QFont("Noto Sans", 9, QFont.Weight.Medium)
+        self._value_fm = QFontMetrics(self._value_font)
+        # Advance width of each row's current value, for tight dirty rects
+        self._value_w = [self._value_fm.horizontalAdvance(v) for _, v, _ in self._rows]
+
+    def _row_rect(self, idx):
+        return QRect(0, idx * ROW_GAP, self.width(), ROW_GAP)
+
+    def set_row(self, idx, value, color=None):
+        label, old_value, old_color = self._rows[idx]
+        color = color or old_color
+        if value == old_value and color == old_color:
+            return
+        self._rows[idx] = (label, value, color)
+        # Only the right-aligned value changes: repaint the wider of old and new
+        tw = self._value_fm.horizontalAdvance(value)
+        dirty_w = max(tw, self._value_w[idx]) + 8
+        self._value_w[idx] = tw
+        self.update(QRect(self.width() - dirty_w, idx * ROW_GAP, dirty_w, ROW_GAP))
 
     def paintEvent(self, e):
         p = QPainter(self)
         p.setRenderHint(QPainter.RenderHint.Antialiasing)
-        lf = QFont("SF Pro Text", 10) if sys.platform == "darwin" else QFont("Noto Sans", 9)
-        vf = QFont("SF Pro Text", 10, QFont.Weight.Medium) if sys.platform == "darwin" \
-             else QFont("Noto Sans", 9, QFont.Weight.Medium)
-        p.setFont(lf)
-        p.setPen(C["text_dim"])
-        p.drawText(0, 16, self._label)
-        p.setFont(vf)
-        p.setPen(self._color)
-        fm = QFontMetrics(vf)
-        tw = fm.horizontalAdvance(self._value)
-        p.drawText(self.width() - tw, 16, self._value)
+        w, dirty = self.width(), e.rect()
+        for i, (label, value, color) in enumerate(self._rows):
+            if not dirty.intersects(self._row_rect(i)):
+                continue
+            y = i * ROW_GAP + ROW_H
+            p.setFont(self._label_font)
+            p.setPen(C["text_dim"])
+            p.drawText(0, y, label)
+            p.setFont(self._value_font)
+            p.setPen(color)
+            p.drawText(w - self._value_w[i], y, value)
         p.end()
 
 # ── Power source indicator ────────────────────────────────────────────────────
 class PowerBar(QWidget):
     """Shows a split bar: % from battery vs % from AC"""
+    _AC_COLOR        = QColor(0, 200, 110)
+    _AC_TEXT_COLOR   = QColor(10, 10, 14)
+    _BAT_COLOR       = QColor(255, 130, 0)
+    _BAT_TEXT_COLOR  = QColor(240, 240, 245)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedHeight(38)
@@ -270,8 +502,23 @@ class PowerBar(QWidget):
         self._status = "Unknown"
         self._capacity = 0
         self._power_w = 0.0
+        self._key = None
+        self._font = QFont("Noto Sans", 9, QFont.Weight.Medium)
+        self._paths = {}   # pill width -> rounded-rect path
+
+    def _pill(self, w):
+        path = self._paths.get(w)
+        if path is None:
+            path = self._paths[w] = QPainterPath()
+            path.addRoundedRect(0, 8, w, 20, 10, 10)
+        return path
 
     def set_data(self, ac_online, status, capacity, power_w):
+        # power_w is smoothed and drifts every tick; only the shown 0.1 W step matters
+        key = (ac_online, status, capacity, round(power_w, 1), power_w > 0.1)
+        if key == self._key:
+            return
+        self._key = key
         self._ac_online = ac_online
         self._status = status
         self._capacity = capacity
@@ -284,39 +531,38 @@ class PowerBar(QWidget):
         w, h = self.width(), self.height()
 
         # Background pill
-        bg = QPainterPath()
-        bg.addRoundedRect(0, 8, w, 20, 10, 10)
-        p.fillPath(bg, C["arc_track"])
+        p.fillPath(self._pill(w), C["arc_track"])
 
         if self._ac_online:
             # AC providing power
-            ac_color = QColor(0, 200, 110)
-            ac_path = QPainterPath()
-            ac_path.addRoundedRect(0, 8, w, 20, 10, 10)
-            p.fillPath(ac_path, ac_color)
+            p.fillPath(self._pill(w), self._AC_COLOR)
             label = f"  ⚡ AC  {self._power_w:.1f}W" if self._power_w > 0.1 else "  ⚡ AC Power"
-            lcolor = QColor(10, 10, 14)
+            lcolor = self._AC_TEXT_COLOR
         else:
             # Battery providing power
             bat_w = int(w * self._capacity / 100)
-            bat_path = QPainterPath()
-            bat_path.addRoundedRect(0, 8, max(bat_w, 20), 20, 10, 10)
-            p.fillPath(bat_path, QColor(255, 130, 0))
+            p.fillPath(self._pill(max(bat_w, 20)), self._BAT_COLOR)
             label = f"  🔋 Battery  {self._power_w:.1f}W" if self._power_w > 0.1 else "  🔋 Battery"
-            lcolor = QColor(240, 240, 245)
+            lcolor = self._BAT_TEXT_COLOR
 
-        lf = QFont("Noto Sans", 9, QFont.Weight.Medium)
-        p.setFont(lf)
+        p.setFont(self._font)
         p.setPen(lcolor)
         p.drawText(QRect(0, 8, w, 20), Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, label)
         p.end()
 
 # ── Animated button ───────────────────────────────────────────────────────────
 class OmenButton(QPushButton):
+    _BORDER_PEN       = QPen(QColor(255, 255, 255, 18), 1)
+    _BORDER_HOVER_PEN = QPen(QColor(255, 255, 255, 30), 1)
+    _TEXT_COLOR       = QColor(240, 240, 245)
+
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
         self._hovered = False
         self._active_color = QColor(0, 160, 90)
+        self._font = QFont("Noto Sans", 9, QFont.Weight.Medium)
+        self._path = None
+        self._path_size = None
         self.setFixedHeight(36)
         self.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         self.setStyleSheet("background: transparent; border: none; color: transparent;")
@@ -345,17 +591,17 @@ class OmenButton(QPushButton):
         else:
             bg = C["btn_normal"]
 
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, w, h, 8, 8)
-        p.fillPath(path, bg)
+        if self._path_size != (w, h):
+            self._path = QPainterPath()
+            self._path.addRoundedRect(0, 0, w, h, 8, 8)
+            self._path_size = (w, h)
+        p.fillPath(self._path, bg)
 
-        border_color = QColor(255, 255, 255, 30 if self._hovered else 18)
-        p.setPen(QPen(border_color, 1))
-        p.drawPath(path)
+        p.setPen(self._BORDER_HOVER_PEN if self._hovered else self._BORDER_PEN)
+        p.drawPath(self._path)
 
-        tf = QFont("Noto Sans", 9, QFont.Weight.Medium)
-        p.setFont(tf)
-        tc = QColor(240, 240, 245) if self.isChecked() or self._hovered else C["text_dim"]
+        p.setFont(self._font)
+        tc = self._TEXT_COLOR if self.isChecked() or self._hovered else C["text_dim"]
         p.setPen(tc)
         p.drawText(QRect(0, 0, w, h), Qt.AlignmentFlag.AlignCenter, self.text())
         p.end()
@@ -372,6 +618,7 @@ STATS_Y    = SEP1_Y + 8                     # 240
 ROW_H      = 16
 ROW_GAP    = 18
 N_ROWS     = 6
+ROW_ENERGY, ROW_DESIGN, ROW_BIOS_CAP, ROW_CYCLES, ROW_TIME, ROW_VOLTAGE = range(N_ROWS)
 SEP2_Y     = STATS_Y + N_ROWS * ROW_GAP + 4 # 352
 BTN_Y      = SEP2_Y + 8                     # 360
 BTN_H      = 36
@@ -379,6 +626,8 @@ PANEL_H    = BTN_Y + BTN_H + 14             # 410
 
 # ── Main panel window ─────────────────────────────────────────────────────────
 class BatteryPanel(QWidget):
+    visibility_changed = pyqtSignal(bool)
+
     def __init__(self):
         super().__init__()
         # Popup: dismissed on click-outside; FramelessHint: no titlebar;
@@ -392,16 +641,68 @@ class BatteryPanel(QWidget):
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setFixedSize(W, PANEL_H)
 
-        self._state    = load_state()
-        self._data     = BattData()
-        self._drag_pos = None
+        STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        self._state       = load_state()
+        self._saved_state = dict(self._state)
+        self._data        = BattData()
+        self._last_key    = None   # displayed values as of the last widget update
+        self._dot_ac      = None   # ac_online as of the last dot repaint
+        self._drag_pos    = None
 
+        self._build_chrome()
         self._build_ui()
-        self._refresh()
 
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self._refresh)
-        self._timer.start(8000)
+    def _build_chrome(self):
+        # Everything but the AC/BAT dot is static, so it is rendered once into
+        # a pixmap (see _render_chrome) and blitted on every paint
+        self._chrome = None
+        self._bg_path = QPainterPath()
+        self._bg_path.addRoundedRect(0, 0, W, PANEL_H, 16, 16)
+        # Nothing outside the rounded corners is ever drawn, so let the
+        # compositor skip those pixels entirely
+        self.setMask(QRegion(self._bg_path.toFillPolygon().toPolygon()))
+        self._dot_path = QPainterPath()
+        self._dot_path.addEllipse(QPointF(W - 18, 14), 4, 4)
+
+    def _render_chrome(self, dpr):
+        w, h = self.width(), self.height()
+        px = QPixmap(round(w * dpr), round(h * dpr))
+        px.setDevicePixelRatio(dpr)
+        px.fill(Qt.GlobalColor.transparent)
+        p = QPainter(px)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Main background with subtle gradient
+        grad = QLinearGradient(0, 0, 0, h)
+        grad.setColorAt(0.0, QColor(18, 18, 22, 215))
+        grad.setColorAt(1.0, QColor(10, 10, 13, 215))
+        p.fillPath(self._bg_path, QBrush(grad))
+
+        # Border
+        p.setPen(QPen(C["border"], 1))
+        p.drawPath(self._bg_path)
+
+        # Top accent line (OMEN red accent)
+        accent = QPainterPath()
+        accent.addRoundedRect(0, 0, w, 3, 1.5, 1.5)
+        ag = QLinearGradient(0, 0, w, 0)
+        ag.setColorAt(0.0, QColor(200, 30, 30, 0))
+        ag.setColorAt(0.3, QColor(220, 40, 40, 200))
+        ag.setColorAt(0.7, QColor(220, 40, 40, 200))
+        ag.setColorAt(1.0, QColor(200, 30, 30, 0))
+        p.fillPath(accent, QBrush(ag))
+
+        # Header text
+        p.setFont(QFont("Noto Sans", 8, QFont.Weight.Medium))
+        p.setPen(QColor(180, 180, 200, 140))
+        p.drawText(QRect(0, 8, w, 16), Qt.AlignmentFlag.AlignHCenter, "OMEN BATTERY")
+
+        # Separators above the stats and above the button
+        for y in (SEP1_Y, SEP2_Y):
+            p.fillRect(MARGIN, y, w - MARGIN * 2, 1, C["separator"])
+
+        p.end()
+        return px
 
     def _build_ui(self):
         # Arc gauge — centred horizontally
@@ -412,29 +713,11 @@ class BatteryPanel(QWidget):
         self._power_bar = PowerBar(self)
         self._power_bar.setGeometry(MARGIN, POWERBAR_Y, W - MARGIN * 2, PB_H)
 
-        # Separator 1
-        sep = QFrame(self)
-        sep.setGeometry(MARGIN, SEP1_Y, W - MARGIN * 2, 1)
-        sep.setStyleSheet("background: rgba(255,255,255,12); border: none;")
-
-        # Stat rows
-        y = STATS_Y
-        self._row_energy   = StatRow("Energy",     parent=self)
-        self._row_design   = StatRow("Design cap", parent=self)
-        self._row_bios_cap = StatRow("BIOS cap",   parent=self)
-        self._row_cycles   = StatRow("Cycles",     parent=self)
-        self._row_time     = StatRow("Time left",  parent=self)
-        self._row_voltage  = StatRow("Voltage",    parent=self)
-
-        for row in [self._row_energy, self._row_design, self._row_bios_cap,
-                    self._row_cycles, self._row_time, self._row_voltage]:
-            row.setGeometry(MARGIN, y, W - MARGIN * 2, ROW_H)
-            y += ROW_GAP
-
-        # Separator 2
-        sep2 = QFrame(self)
-        sep2.setGeometry(MARGIN, SEP2_Y, W - MARGIN * 2, 1)
-        sep2.setStyleSheet("background: rgba(255,255,255,12); border: none;")
+        # Stat rows (order matches ROW_ENERGY … ROW_VOLTAGE)
+        self._stats = StatsGrid(
+            ["Energy", "Design cap", "BIOS cap", "Cycles", "Time left", "Voltage"], self
+        )
+        self._stats.setGeometry(MARGIN, STATS_Y, W - MARGIN * 2, N_ROWS * ROW_GAP)
 
         # Top Up button — full width with margins, properly pinned
         self._btn_topup = OmenButton("Top Up to 100%", self)
@@ -446,18 +729,29 @@ class BatteryPanel(QWidget):
     def _toggle_topup(self):
         self._state["top_up_active"] = self._btn_topup.isChecked()
         self._state["notified_at"] = -1
-        save_state(self._state)
+        self._save_state()
         if self._btn_topup.isChecked():
             notify("Top Up activated", "Will notify when battery reaches 100%", icon="battery-full")
-        self._refresh()
+        self.apply(self._data)
 
-    def _refresh(self):
-        d = BattData()
+    def apply(self, d):
+        """Take a new snapshot; widgets are only touched while the panel is open"""
         self._data = d
+        self._check_limit(d)
+        if not self.isVisible():
+            return
+
         s = self._state
-        limit = s.get("limit", 80)
         topup = s.get("top_up_active", False)
-        effective_limit = 100 if topup else limit
+        effective_limit = 100 if topup else s.get("limit", 80)
+
+        # Skip all widget work when nothing that is displayed has changed
+        key = (d.capacity, d.status, d.ac_online, round(d.power_avg_w, 1),
+               round(d.energy_now, 1), round(d.energy_full, 1), round(d.energy_design),
+               d.cycle_count, d.time_str, round(d.voltage_v, 2), topup, effective_limit)
+        if key == self._last_key:
+            return
+        self._last_key = key
 
         # Gauge
         self._gauge.set_data(d.capacity, effective_limit, topup, d.status)
@@ -467,91 +761,95 @@ class BatteryPanel(QWidget):
         self._btn_topup.setText("Cancel Top Up" if topup else "Top Up to 100%")
 
         # Power bar
-        self._power_bar.set_data(d.ac_online, d.status, d.capacity, d.power_w)
+        self._power_bar.set_data(d.ac_online, d.status, d.capacity, d.power_avg_w)
 
         # Stat rows
-        self._row_energy.set_value(
+        rows = self._stats
+        rows.set_row(ROW_ENERGY,
             f"{d.energy_now:.1f} / {d.energy_full:.1f} Wh",
             C["text_main"]
         )
-        self._row_design.set_value(f"{d.energy_design:.0f} Wh")
-        self._row_bios_cap.set_value(
+        rows.set_row(ROW_DESIGN, f"{d.energy_design:.0f} Wh")
+        rows.set_row(ROW_BIOS_CAP,
             f"{d.bios_cap_pct:.0f}%",
             C["text_amber"] if d.bios_cap_pct < 85 else C["text_green"]
         )
-        self._row_cycles.set_value(str(d.cycle_count) if d.cycle_count else "—")
-        self._row_time.set_value(d.time_str)
-        self._row_voltage.set_value(f"{d.voltage_v:.2f} V" if d.voltage_v else "—")
+        rows.set_row(ROW_CYCLES, str(d.cycle_count) if d.cycle_count else "—")
+        rows.set_row(ROW_TIME, d.time_str)
+        rows.set_row(ROW_VOLTAGE, f"{d.voltage_v:.2f} V" if d.voltage_v else "—")
+
+        # The AC/BAT dot is the only dynamic thing the panel paints itself;
+        # a full update() would also repaint every child it overlaps
+        if d.ac_online != self._dot_ac:
+            self._dot_ac = d.ac_online
+            self.update(self._dot_path.boundingRect().toAlignedRect())
+
+    def _check_limit(self, d):
+        s = self._state
+        limit = s.get("limit", 80)
+        topup = s.get("top_up_active", False)
+        effective_limit = 100 if topup else limit
 
         # Charge limit logic
         notified_at = s.get("notified_at", -1)
         if d.ac_online and d.capacity >= effective_limit and notified_at != d.capacity:
             if topup:
-                notify(
+                sent = notify(
                     "🔋 Battery Full",
                     "Reached 100% — safe to unplug now.",
                     urgency="normal", icon="battery-full"
                 )
-                self._state["top_up_active"] = False
-                self._btn_topup.setChecked(False)
-                self._btn_topup.setText("Top Up to 100%")
+                if sent:
+                    self._state["top_up_active"] = False
+                    self._btn_topup.setChecked(False)
+                    self._btn_topup.setText("Top Up to 100%")
             else:
-                notify(
+                sent = notify(
                     f"🔋 {d.capacity}% — Unplug Now",
                     f"Battery hit your {limit}% limit. Unplug to protect battery life.",
                     urgency="critical", icon="battery-caution"
                 )
-            self._state["notified_at"] = d.capacity
-            save_state(self._state)
+            # Only mark the alert as done once it went out; otherwise retry next sample
+            if sent:
+                self._state["notified_at"] = d.capacity
 
         # Clear notified_at when unplugged (so next plug-in triggers again)
         if not d.ac_online and notified_at != -1:
             self._state["notified_at"] = -1
-            save_state(self._state)
 
-        self.update()
-
-    def paintEvent(self, e):
-        p = QPainter(self)
-        p.setRenderHint(QPainter.RenderHint.Antialiasing)
-        w, h = self.width(), self.height()
+        self._save_state()
 
-        # Main background
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, w, h, 16, 16)
+    def _save_state(self):
+        # Only touch the disk when something actually changed
+        if self._state != self._saved_state:
+            save_state(self._state)
+            self._saved_state = dict(self._state)
 
-        # Subtle gradient bg
-        grad = QLinearGradient(0, 0, 0, h)
-        grad.setColorAt(0.0, QColor(18, 18, 22, 215))
-        grad.setColorAt(1.0, QColor(10, 10, 13, 215))
-        p.fillPath(path, QBrush(grad))
+    def showEvent(self, e):
+        # Widgets are not updated while hidden, so bring them up to date on open
+        self.apply(sampler.snapshot(force=True))
+        super().showEvent(e)
+        self.visibility_changed.emit(True)
 
-        # Border
-        p.setPen(QPen(C["border"], 1))
-        p.drawPath(path)
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self.visibility_changed.emit(False)
 
-        # Top accent line (OMEN red accent)
-        accent = QPainterPath()
-        accent.addRoundedRect(0, 0, w, 3, 1.5, 1.5)
-        ag = QLinearGradient(0, 0, w, 0)
-        ag.setColorAt(0.0, QColor(200, 30, 30, 0))
-        ag.setColorAt(0.3, QColor(220, 40, 40, 200))
-        ag.setColorAt(0.7, QColor(220, 40, 40, 200))
-        ag.setColorAt(1.0, QColor(200, 30, 30, 0))
-        p.fillPath(accent, QBrush(ag))
+    def paintEvent(self, e):
+        dpr = self.devicePixelRatioF()
+        if self._chrome is None or self._chrome.devicePixelRatio() != dpr:
+            self._chrome = self._render_chrome(dpr)
 
-        # Header text
-        hf = QFont("Noto Sans", 8, QFont.Weight.Medium)
-        p.setFont(hf)
-        p.setPen(QColor(180, 180, 200, 140))
-        p.drawText(QRect(0, 8, w, 16), Qt.AlignmentFlag.AlignHCenter, "OMEN BATTERY")
+        p = QPainter(self)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # The chrome covers the whole panel, so copy it instead of blending
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        p.drawPixmap(0, 0, self._chrome)
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
 
         # AC/BAT dot indicator
         d = self._data
-        dot_color = C["dot_ac"] if d.ac_online else C["dot_bat"]
-        dp = QPainterPath()
-        dp.addEllipse(QPointF(w - 18, 14), 4, 4)
-        p.fillPath(dp, dot_color)
+        p.fillPath(self._dot_path, C["dot_ac"] if d.ac_online else C["dot_bat"])
 
         p.end()
 
@@ -632,16 +930,57 @@ def make_tray_icon(pct: int, ac: bool) -> QIcon:
     p.end()
     return QIcon(px)
 
+TRAY_ICON_CACHE_SIZE = 64
+_tray_icon_cache: dict[tuple[int, bool], QIcon] = {}
+
+def cached_tray_icon(pct: int, ac: bool) -> QIcon:
+    """make_tray_icon() behind a small LRU; there are only 202 possible icons"""
+    key = (pct, ac)
+    icon = _tray_icon_cache.pop(key, None)
+    if icon is None:
+        icon = make_tray_icon(pct, ac)
+        if len(_tray_icon_cache) >= TRAY_ICON_CACHE_SIZE:
+            del _tray_icon_cache[next(iter(_tray_icon_cache))]
+    _tray_icon_cache[key] = icon   # re-insert as most recently used
+    return icon
+
 # ── Background poller (runs in main thread via timer for simplicity) ──────────
+POLL_MS     = 30_000
+BACKSTOP_MS = 5 * 60_000
+
 class App:
     def __init__(self):
         self.panel = BatteryPanel()
         self.tray  = QSystemTrayIcon()
+        self._tray_key = None
         self._setup_tray()
-        self._tray_timer = QTimer()
-        self._tray_timer.timeout.connect(self._update_tray)
-        self._tray_timer.start(15000)
-        self._update_tray()
+
+        # Battery changes arrive as uevents; the timer is only a backstop
+        # unless the panel is open (live power/voltage) or uevents are unavailable
+        self._uevents = open_uevent_socket()
+        if self._uevents is not None:
+            self._notifier = QSocketNotifier(self._uevents.fileno(), QSocketNotifier.Type.Read)
+            self._notifier.activated.connect(self._on_uevent)
+
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._poll)
+        self.panel.visibility_changed.connect(self._set_poll_rate)
+        self._set_poll_rate(False)
+        self._poll()
+
+    def _set_poll_rate(self, panel_visible):
+        live = panel_visible or self._uevents is None
+        self._timer.start(POLL_MS if live else BACKSTOP_MS)
+
+    def _on_uevent(self):
+        if drain_power_supply_uevents(self._uevents):
+            self._poll()
+
+    def _poll(self):
+        # One sample per tick, shared by the panel and the tray
+        d = sampler.snapshot()
+        self.panel.apply(d)
+        self._update_tray(d)
 
     def _setup_tray(self):
         menu = QMenu()
@@ -664,12 +1003,13 @@ class App:
         else:
             self.panel.show_at_cursor()
 
-    def _update_tray(self):
-        d = BattData()
-        icon = make_tray_icon(d.capacity, bool(d.ac_online))
-        self.tray.setIcon(icon)
+    def _update_tray(self, d):
+        key = (d.capacity, bool(d.ac_online))
+        if key != self._tray_key:
+            self.tray.setIcon(cached_tray_icon(*key))
+            self._tray_key = key
         status_str = "AC" if d.ac_online else "Battery"
-        power_str = f"  {d.power_w:.1f}W" if d.power_w > 0.1 else ""
+        power_str = f"  {d.power_avg_w:.1f}W" if d.power_avg_w > 0.1 else ""
         self.tray.setToolTip(
             f"OMEN Battery  {d.capacity}%  {status_str}{power_str}\n"
             f"{d.status}  •  {d.time_str}"